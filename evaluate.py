@@ -19,16 +19,29 @@
 
 import os
 import json
-from datetime import datetime, timedelta
-import dateutil.parser
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from ml_tools import tools
 import matplotlib.pyplot as plt
-from sklearn import metrics
 import numpy as np
 import itertools
+from collections import defaultdict
 import argparse
 import seaborn as sns
 
+# orjson is optional, it parses the stats files considerably faster than the standard json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numba is optional, without it the confusion matrix is built with np.bincount instead.
+try:
+    import numba
+except ImportError:
+    numba = None
+
 # number of seconds between clips required to trigger a a new visit
 NEW_VISIT_THRESHOLD = 3*60
 
@@ -39,32 +52,73 @@ NULL_TAGS = ['false-positive', 'none', 'no-tag']
 
 classes = ['bird', 'possum', 'rat', 'hedgehog', 'none']
 
+# sets for fast membership tests
+NULL_TAGS_SET = frozenset(NULL_TAGS)
+CLASSES_SET = frozenset(classes)
+
+# maps class names to their integer code
+LABEL_TO_IDX = {label: i for i, label in enumerate(classes)}
+
+# code shared by all labels outside of classes, kept non-negative so codes can be used as indexes
+UNKNOWN_IDX = len(classes)
+
+# per track fields stored as a structured array (see get_track_array), labels are integer codes (see label_code).
+TRACK_DTYPE = [
+    ('score', 'f4'),
+    ('clarity', 'f4'),
+    ('label', 'i1'),
+    ('true', 'i1'),
+    ('duration', 'f4'),
+    ('confidence', 'f8'),
+]
+
+# ops... must have lost time zone at some point, so I put it back here...
+TZ_SHIFT = timedelta(hours=13)
+
+@functools.lru_cache(maxsize=4096)
+def parse_time(time_string):
+    """ Parses an ISO-8601 time from a stats file and applies the time zone shift. """
+    return datetime.fromisoformat(time_string.replace('Z', '+00:00')) + TZ_SHIFT
+
+def label_code(label):
+    """
+    Returns the integer code for given label.  Labels outside of classes all share UNKNOWN_IDX so they still count as
+    misses against the true class.
+    """
+    return LABEL_TO_IDX.get(label, UNKNOWN_IDX)
+
+def to_seconds(time):
+    """ Returns time as seconds since epoch.  Naive times are treated as UTC so differences match datetime arithmetic. """
+    if time.tzinfo is None: time = time.replace(tzinfo=timezone.utc)
+    return time.timestamp()
+
 class TrackResult:
 
     def __init__(self, track_record):
         """ Creates track result from track stats entry. """
-        # ops... must have lost time zone at some point, so I put it back here...
-        self.start_time = dateutil.parser.parse(track_record["start_time"]) + timedelta(hours=13)
-        self.end_time = dateutil.parser.parse(track_record["end_time"]) + timedelta(hours=13)
+        self.start_time = parse_time(track_record["start_time"])
+        self.end_time = parse_time(track_record["end_time"])
+        self.start_ts = to_seconds(self.start_time)
+        self.end_ts = to_seconds(self.end_time)
         self.label = track_record["label"]
         self.score = track_record["confidence"]
         self.clarity = track_record["clarity"]
 
-        if self.label in NULL_TAGS: self.label = 'none'
+        if self.label in NULL_TAGS_SET: self.label = 'none'
+
+        self.label_idx = label_code(self.label)
+
+        # the tracks 'confidence' level which is a combination of the score and clarity.
+        score_uncertainty = 1 - self.score
+        clarity_uncertainty = 1 - self.clarity
+        self.confidence = 1 - ((score_uncertainty * clarity_uncertainty) ** 0.5)
 
     def __repr__(self):
         return "{} {:.1f} clarity {:.1f}".format(self.label, self.score * 10, self.clarity * 10)
 
     @property
     def duration(self):
-        return (self.end_time - self.start_time).total_seconds()
-
-    @property
-    def confidence(self):
-        """ The tracks 'confidence' level which is a combination of the score and clarity. """
-        score_uncertanity = 1-self.score
-        clarity_uncertainty = 1-self.clarity
-        return 1 - ((score_uncertanity * clarity_uncertainty) ** 0.5)
+        return self.end_ts - self.start_ts
 
     def print_tree(self, level = 0):
         print("\t" * level + "-" + str(self))
@@ -79,42 +133,45 @@ class ClipResult:
         self.tracks = [TrackResult(track) for track in self.stats['tracks']]
 
         self.source = os.path.basename(full_path)
-        self.start_time = dateutil.parser.parse(self.stats['start_time']) + timedelta(hours=13)
-        self.end_time = dateutil.parser.parse(self.stats['end_time']) + timedelta(hours=13)
+        self.start_time = parse_time(self.stats['start_time'])
+        self.end_time = parse_time(self.stats['end_time'])
+        self.start_ts = to_seconds(self.start_time)
+        self.end_ts = to_seconds(self.end_time)
         self.camera = self.stats['camera']
         self.true_tag = self.stats['original_tag']
 
-        if self.true_tag in NULL_TAGS: self.true_tag = 'none'
+        if self.true_tag in NULL_TAGS_SET: self.true_tag = 'none'
 
         self.classifier_best_guess, self.classifier_best_score = self.get_best_guess()
+
+        self.true_tag_idx = label_code(self.true_tag)
+        self.classifier_best_idx = label_code(self.classifier_best_guess)
         
     def get_best_guess(self):
         """ Returns the best guess from classification data. """
-        class_confidences = {}
-        best_confidence = 0
-        best_label = "none"
-        for track in self.tracks:
-            label = track.label
+        if len(self.tracks) == 0:
+            return "none", 0
 
-            confidence = track.confidence
+        confidences = np.array([track.confidence for track in self.tracks], dtype=np.float64)
 
-            # we weight the false-positives lower as if they co-occur with an animals we want the animals to come
-            # across
-            if label == 'none': confidence *= 0.5
+        # we weight the false-positives lower as if they co-occur with an animals we want the animals to come
+        # across
+        is_none = np.array([track.label == 'none' for track in self.tracks], dtype=bool)
+        confidences[is_none] *= 0.5
 
-            class_confidences[label] = max(class_confidences.get(label, 0.0), confidence)
+        # tracks with a NaN (or non-positive) confidence can never be the best guess
+        confidences[~(confidences > 0)] = 0
 
-            confidence = class_confidences[label]
+        # argmax returns the first occurrence, so ties go to the earliest track
+        best = np.argmax(confidences)
+        if confidences[best] <= 0:
+            return "none", 0
 
-            if confidence > best_confidence:
-                best_label = label
-                best_confidence = confidence
-
-        return best_label, best_confidence
+        return self.tracks[best].label, float(confidences[best])
 
     @property
     def duration(self):
-        return (self.end_time - self.start_time).total_seconds()
+        return self.end_ts - self.start_ts
 
     def __repr__(self):
         return "{} {} {:.1f}".format(self.true_tag, self.classifier_best_guess, self.classifier_best_score * 10)
@@ -130,11 +187,20 @@ class VisitResult:
     def __init__(self, first_clip):
         """ First clip is used a basis for this visit.  All other clips should have the same camera and true_tag. """
         self.clips = [first_clip]
+        self._best_clip = None
 
     def add_clip(self, clip):
-        """ Adds a clip to the clip list.  Clips are maintained start_time sorted order. """
+        """
+        Adds a clip to the clip list.  Clips must be added in start_time order (as get_visits does) so that the list
+        remains sorted without needing to be re-sorted on every insert.
+        """
         self.clips.append(clip)
-        self.clips.sort(key = lambda clip: clip.start_time)
+        self._best_clip = None
+
+    def finalize(self):
+        """ Caches the clip with the best classifier score.  Should be called once all clips have been added. """
+        # search in reverse so that ties resolve to the latest clip
+        self._best_clip = max(reversed(self.clips), key=lambda x: x.classifier_best_score)
 
     @property
     def camera(self):
@@ -144,6 +210,10 @@ class VisitResult:
     def true_tag(self):
         return self.clips[0].true_tag
 
+    @property
+    def true_tag_idx(self):
+        return self.clips[0].true_tag_idx
+
     @property
     def start_time(self):
         if len(self.clips) == 0: return 0.0
@@ -162,21 +232,25 @@ class VisitResult:
     @property
     def duration(self):
         """ Duration of visit in seconds. """
-        return (self.end_time - self.start_time).total_seconds()
+        return self.clips[-1].end_ts - self.clips[0].start_ts
 
     @property
     def predicted_tag(self):
         """ Returns the predicted tag based on best guess from individual clips. """
-        sorted_clips = sorted(self.clips, key = lambda x: x.classifier_best_score)
-        best_guess = sorted_clips[-1].classifier_best_guess
-        return best_guess
+        if self._best_clip is None: self.finalize()
+        return self._best_clip.classifier_best_guess
+
+    @property
+    def predicted_idx(self):
+        """ Returns the integer code of the predicted tag. """
+        if self._best_clip is None: self.finalize()
+        return self._best_clip.classifier_best_idx
 
     @property
     def predicted_confidence(self):
-        """ Returns the predicted tag based on best guess from individual clips. """
-        sorted_clips = sorted(self.clips, key=lambda x: x.classifier_best_score)
-        best_guess = sorted_clips[-1].classifier_best_score
-        return best_guess
+        """ Returns the confidence of the best guess from individual clips. """
+        if self._best_clip is None: self.finalize()
+        return self._best_clip.classifier_best_score
 
     def __repr__(self):
         return "{} {} {:.1f}".format(self.true_tag, self.predicted_tag, self.predicted_confidence * 10)
@@ -196,19 +270,48 @@ def is_stats_file(filename):
 
 def read_stats_file(full_path):
     """ reads in given stats file. """
-    stats = json.load(open(full_path, 'r'))
-
-    return stats
-
-
-def show_confusion_matrix(true_class, pred_class, labels, normalize=True, title="Classification Confusion Matrix"):
-
-    cm = metrics.confusion_matrix(true_class, pred_class, labels=labels)
+    with open(full_path, 'rb') as f:
+        data = f.read()
+
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # json.dump writes non-finite floats as NaN, which orjson rejects
+            pass
+
+    return json.loads(data)
+
+
+if numba:
+    @numba.njit(cache=True)
+    def build_confusion_matrix(true_idx, pred_idx, n_labels):
+        """
+        Builds a confusion matrix from integer coded true and predicted labels.
+        :param true_idx: int array of true label codes
+        :param pred_idx: int array of predicted label codes
+        :param n_labels: number of label codes, all codes must be less than this
+        :return: confusion matrix [n_labels, n_labels], rows are true labels and columns predicted labels
+        """
+        cm = np.zeros((n_labels, n_labels), np.int64)
+        for i in range(true_idx.size):
+            cm[true_idx[i], pred_idx[i]] += 1
+        return cm
+else:
+    def build_confusion_matrix(true_idx, pred_idx, n_labels):
+        """ Builds a confusion matrix from integer coded true and predicted labels, see the numba version above. """
+        pairs = true_idx.astype(np.int64) * n_labels + pred_idx
+        return np.bincount(pairs, minlength=n_labels ** 2).reshape(n_labels, n_labels)
+
+
+def show_confusion_matrix(cm, labels, normalize=True, title="Classification Confusion Matrix"):
+    """ Plots given confusion matrix, rows are true labels and columns predicted labels. """
 
     # normalise matrix
     if normalize:
-        print(cm.sum(axis=1)[np.newaxis, :])
-        cm = cm.astype('float') / cm.sum(axis=1)[:, np.newaxis]
+        row_sum = cm.sum(axis=1)[:, np.newaxis]
+        print(row_sum.T)
+        cm = np.divide(cm, row_sum, out=np.zeros(cm.shape, dtype=float), where=row_sum > 0)
 
     fig = plt.figure(figsize=(8, 8))
     ax = fig.add_subplot(111)
@@ -229,17 +332,26 @@ def show_confusion_matrix(true_class, pred_class, labels, normalize=True, title=
     plt.show()
 
 
-def show_breakdown(true_class, pred_class, title="Confusion Matrix"):
+def show_breakdown(cm, title="Confusion Matrix"):
+    """
+    Shows confusion matrix and f1 scores.
+    :param cm: confusion matrix indexed by label code (see label_code), including the UNKNOWN_IDX row and column
+    """
 
-    # confusion matrix
-    show_confusion_matrix(true_class, pred_class, classes, normalize=True, title=title)
+    n_classes = len(classes)
+    total = cm.sum()
 
-    # get f1 scores
-    f1_scores = metrics.f1_score(true_class, pred_class, classes, average=None)
+    # f1 scores, labels that never occur score 0
+    tp = np.diag(cm)
+    fp = cm.sum(axis=0) - tp
+    fn = cm.sum(axis=1) - tp
+    f1_scores = (2 * tp / np.maximum(2 * tp + fp + fn, 1))[:n_classes]
 
-    correct = 0
-    for true, pred in zip(true_class, pred_class):
-        if true==pred: correct += 1
+    cm = cm[:n_classes, :n_classes]
+
+    show_confusion_matrix(cm, classes, normalize=True, title=title)
+
+    correct = np.trace(cm)
 
     print("F1 scores:")
     for class_name, f1_score in zip(classes, f1_scores):
@@ -247,7 +359,7 @@ def show_breakdown(true_class, pred_class, title="Confusion Matrix"):
 
     print()
 
-    print("Correctly classified {0} / {1} = {2:.2f}%".format(correct, len(true_class), 100 * correct / len(true_class)))
+    print("Correctly classified {0} / {1} = {2:.2f}%".format(correct, total, 100 * correct / total))
     print("Final score: {:.1f}".format(100 * np.mean(f1_scores)))
 
 
@@ -256,28 +368,31 @@ def breakdown_tracks(visits):
 
     print("-" * 60)
     print("Tracks:")
-    total_duration = 0
-    tracks = []
-    true_class = []
-    pred_class = []
+
+    n_tracks = sum(len(clip.tracks) for visit in visits for clip in visit.clips)
+    true_idx = np.empty(n_tracks, dtype=np.int8)
+    pred_idx = np.empty(n_tracks, dtype=np.int8)
+    durations = np.empty(n_tracks, dtype=np.float32)
+
+    i = 0
     for visit in visits:
         for clip in visit.clips:
-            if clip.true_tag not in classes:
+            if clip.true_tag not in CLASSES_SET:
                 print("Warning, invalid true tag", clip.true_tag)
             for track in clip.tracks:
-                tracks.append(track)
-                total_duration += track.duration
-                true_class.append(clip.true_tag)
-                pred_class.append(track.label)
-                if track.label not in classes:
+                true_idx[i] = clip.true_tag_idx
+                pred_idx[i] = track.label_idx
+                durations[i] = track.duration
+                if track.label not in CLASSES_SET:
                     print("Warning, invalid label",track.label)
+                i += 1
 
     print()
-    print("Total tracks: {} {:.1f}h".format(len(tracks), total_duration / 60 / 60))
+    print("Total tracks: {} {:.1f}h".format(n_tracks, durations.sum() / 60 / 60))
 
     print("-" * 60)
 
-    show_breakdown(true_class, pred_class, "Track Confusion Matrix")
+    show_breakdown(build_confusion_matrix(true_idx, pred_idx, UNKNOWN_IDX + 1), "Track Confusion Matrix")
 
 
 def breakdown_clips(visits):
@@ -286,31 +401,21 @@ def breakdown_clips(visits):
     # display each clip
     print("-" * 60)
     print("Clips:")
-    errors = 0
-    correct = 0
     total_duration = 0
-    i = 0
-    clips = []
+
+    # accumulate the confusion matrix directly
+    cm = np.zeros((UNKNOWN_IDX + 1, UNKNOWN_IDX + 1), dtype=np.int64)
     for visit in visits:
         for clip in visit.clips:
-            i += 1
-            clips.append(clip)
-            #print(i + 1, clip.true_tag, clip.classifier_best_guess, clip.classifier_best_score, clip.start_time)
-            if clip.true_tag == clip.classifier_best_guess:
-                correct += 1
-            else:
-                errors += 1
+            cm[clip.true_tag_idx, clip.classifier_best_idx] += 1
             total_duration += clip.duration
 
     print()
-    print("Total footage: {} clips {:.1f}h".format(len(clips), total_duration/60/60))
+    print("Total footage: {} clips {:.1f}h".format(cm.sum(), total_duration/60/60))
 
     print("-" * 60)
 
-    true_class = [clip.true_tag for clip in clips]
-    pred_class = [clip.classifier_best_guess for clip in clips]
-
-    show_breakdown(true_class, pred_class, "Clip Confusion Matrix")
+    show_breakdown(cm, "Clip Confusion Matrix")
 
 
 def show_error_tree(visits):
@@ -333,93 +438,89 @@ def breakdown_visits(visits):
             correct += 1
 
     # confusion matrix
-    true_class = [visit.true_tag for visit in visits]
-    pred_class = [visit.predicted_tag for visit in visits]
+    true_idx = np.fromiter((visit.true_tag_idx for visit in visits), dtype=np.int8)
+    pred_idx = np.fromiter((visit.predicted_idx for visit in visits), dtype=np.int8)
 
-    show_breakdown(true_class, pred_class, "Visit Confusion Matrix")
+    show_breakdown(build_confusion_matrix(true_idx, pred_idx, UNKNOWN_IDX + 1), "Visit Confusion Matrix")
 
 
-def show_errors_by_score(visits):
-    """ Displays errors in terms of their score level. """
+def get_track_array(visits):
+    """ Returns a structured array (of TRACK_DTYPE) containing one entry for each track in given visits. """
+    clip_tracks = [(clip, track) for visit in visits for clip in visit.clips for track in clip.tracks]
 
-    # visits by score
+    tracks = np.zeros(len(clip_tracks), dtype=TRACK_DTYPE)
+    tracks['score'] = [track.score for clip, track in clip_tracks]
+    tracks['clarity'] = [track.clarity for clip, track in clip_tracks]
+    tracks['label'] = [track.label_idx for clip, track in clip_tracks]
+    tracks['true'] = [clip.true_tag_idx for clip, track in clip_tracks]
+    tracks['duration'] = [track.duration for clip, track in clip_tracks]
+    tracks['confidence'] = [track.confidence for clip, track in clip_tracks]
 
-    errors = []
-    correct = []
+    return tracks
 
-    for visit in visits:
-        if visit.true_tag == visit.predicted_tag:
-            correct.append(visit.predicted_confidence * 10)
-        else:
-            errors.append(visit.predicted_confidence * 10)
+
+def show_errors_by_score(visits):
+    """ Displays errors in terms of their score level. """
 
     bin_divisions = 2
     bins = [x/bin_divisions for x in range(10*bin_divisions+1)]
-    plt.title("Visit Errors by Confidence")
-    plt.hist(correct, bins=bins, label='correct')
-    plt.hist(errors, bins=bins, label='error')
-    plt.legend()
-    plt.show()
 
-    print("Max confidence on misclassified visit",max(errors))
+    def plot_errors(title, correct, errors):
+        plt.title(title)
+        plt.hist(correct, bins=bins, label='correct')
+        plt.hist(errors, bins=bins, label='error')
+        plt.legend()
+        plt.show()
 
-    # clips by score
+    # collect visit and clip scores in a single pass
 
-    errors = []
-    correct = []
+    visit_errors = []
+    visit_correct = []
+    clip_errors = []
+    clip_correct = []
 
     for visit in visits:
+        if visit.true_tag == visit.predicted_tag:
+            visit_correct.append(visit.predicted_confidence * 10)
+        else:
+            visit_errors.append(visit.predicted_confidence * 10)
         for clip in visit.clips:
             if clip.true_tag == clip.classifier_best_guess:
-                correct.append(clip.classifier_best_score * 10)
+                clip_correct.append(clip.classifier_best_score * 10)
             else:
-                errors.append(clip.classifier_best_score * 10)
-
-    plt.title("Clip Errors by Confidence")
-    plt.hist(correct, bins=bins, label='correct')
-    plt.hist(errors, bins=bins, label='error')
-    plt.legend()
-    plt.show()
+                clip_errors.append(clip.classifier_best_score * 10)
 
     # tracks by score
 
-    errors = []
-    correct = []
+    tracks = get_track_array(visits)
+    is_correct = tracks['true'] == tracks['label']
+    track_correct = tracks['confidence'][is_correct] * 10
+    track_errors = tracks['confidence'][~is_correct] * 10
 
-    for visit in visits:
-        for clip in visit.clips:
-            for track in clip.tracks:
-                if clip.true_tag == track.label:
-                    correct.append(track.confidence * 10)
-                else:
-                    errors.append(track.confidence * 10)
-
-    plt.title("Track Errors by Confidence")
-    plt.hist(correct, bins=bins, label='correct')
-    plt.hist(errors, bins=bins, label='error')
-    plt.legend()
-    plt.show()
+    plot_errors("Visit Errors by Confidence", visit_correct, visit_errors)
+    print("Max confidence on misclassified visit",max(visit_errors))
+    plot_errors("Clip Errors by Confidence", clip_correct, clip_errors)
+    plot_errors("Track Errors by Confidence", track_correct, track_errors)
 
 def get_visits(path):
     """ Scans a folder loading all clip statstics, and formats them into visits. """
-    all_records = []
-
-    # fetch the records
-    for filename in os.listdir(path):
-        if is_stats_file(filename):
-            record = ClipResult(os.path.join(path, filename))
-            if record.classifier_best_guess in classes:
-                all_records.append(record)
+    # fetch the records, loading the stats files in parallel
+    with os.scandir(path) as entries:
+        paths = [entry.path for entry in entries if entry.is_file() and is_stats_file(entry.name)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        all_records = list(executor.map(ClipResult, paths))
+
+    # bucket records by camera in a single pass
+    camera_records = defaultdict(list)
+    for record in all_records:
+        if record.classifier_best_guess in CLASSES_SET and record.true_tag in CLASSES_SET:
+            camera_records[record.camera].append(record)
 
     # check basic stats, such as missed objects, incorrect objects.
 
-    cameras = set([record.camera for record in all_records])
-
     visits = []
 
-    for camera in cameras:
-
-        records = [record for record in all_records if record.camera == camera and record.true_tag in classes]
+    for camera, records in camera_records.items():
 
         # group clips into visits by camera
         records.sort(key=lambda x: x.start_time)
@@ -433,7 +534,7 @@ def get_visits(path):
                 current_visit = VisitResult(record)
                 visits.append(current_visit)
 
-            gap = (record.start_time - previous_record_end).total_seconds() if previous_record_end else 0.0
+            gap = record.start_ts - previous_record_end if previous_record_end is not None else 0.0
 
             # start a new visit if gap is too large, or tag changes.
             if gap >= NEW_VISIT_THRESHOLD or (record.true_tag != current_visit.true_tag):
@@ -442,43 +543,46 @@ def get_visits(path):
             else:
                 current_visit.add_clip(record)
 
-            previous_record_end= record.end_time
+            previous_record_end = record.end_ts
+
+    for visit in visits:
+        visit.finalize()
 
     return visits
 
 
 def show_visits_over_days(visits):
+    """ Plots predicted visits by hour of day, one plot for each day. """
 
-    # bin visits in days
-    visit_bins = {}
+    # integer code each visit by day, hour, and predicted class in a single sweep
+    dates = []
+    hours = []
+    class_idx = []
     for visit in visits:
         if visit.predicted_tag == 'none': continue
-        visit_midpoint = visit.start_time + timedelta(seconds=visit.duration / 2)
-        date = visit_midpoint.replace(hour=0, minute=0, second=0, microsecond=0)
-        offset = (visit_midpoint - date).total_seconds() / 60 / 60
-        if date not in visit_bins: visit_bins[date] = []
-        visit_bins[date].append((offset, visit))
+        visit_midpoint = visit.mid_time
+        dates.append(visit_midpoint.replace(hour=0, minute=0, second=0, microsecond=0))
+        hours.append(visit_midpoint.hour)
+        class_idx.append(visit.predicted_idx)
 
-    bins = range(0, 24)
+    days = sorted(set(dates))
+    day_to_idx = {date: i for i, date in enumerate(days)}
+    day_idx = [day_to_idx[date] for date in dates]
 
-    for date, visit_bin in visit_bins.items():
-        plt.title("Classifier Visit Sightings for {}".format(date.strftime("%D %Y/%m/%d")))
+    # visit counts by [day, hour, class]
+    counts = np.zeros((len(days), 24, len(classes)), dtype=np.int32)
+    np.add.at(counts, (np.array(day_idx, dtype=np.int32), np.array(hours, dtype=np.int32), np.array(class_idx, dtype=np.int32)), 1)
 
-        xs = []
-
-        for label in classes:
-            xs.append([])
-            for offset, visit in visit_bin:
-                if visit.predicted_tag != label:
-                    continue
-                xs[-1].append(offset)
+    for i, date in enumerate(days):
+        plt.title("Classifier Visit Sightings for {}".format(date.strftime("%D %Y/%m/%d")))
 
-        print(xs)
+        bottom = np.zeros(24, dtype=np.int32)
+        for j, class_name in enumerate(classes):
+            plt.bar(range(24), counts[i, :, j], width=1, align='edge', bottom=bottom, label=class_name)
+            bottom = bottom + counts[i, :, j]
 
-        for i, x in enumerate(xs):
-            plt.hist(x, bins, histtype='bar', stacked=True, label=classes[i])
-            ax = plt.gca()
-            ax.set_ylim([0, 10])
+        ax = plt.gca()
+        ax.set_ylim([0, 10])
         plt.legend()
         plt.show()
 
@@ -490,10 +594,10 @@ def plot_visits(visits, true_tags=False):
     :return:
     """
 
-    start_date = min([visit.start_time for visit in visits])
+    start_date = min(visit.start_time for visit in visits)
 
     visits = sorted(visits, key = lambda x: x.predicted_tag)
-    cameras = sorted(list(set([visit.camera for visit in visits])))
+    cameras = sorted(set(visit.camera for visit in visits))
 
     data_x = [visit.camera for visit in visits]
     data_y = [(visit.start_time - start_date).total_seconds() / (60*60*24) for visit in visits]
@@ -546,14 +650,10 @@ def print_summary(visits):
 
     print("Found {} visits.".format(len(visits)))
 
-    animal_visits = {}
-    for label in classes:
-        animal_visits[label] = 0
-
-    for visit in visits:
-        animal_visits[visit.predicted_tag] += 1
+    predicted = np.fromiter((visit.predicted_idx for visit in visits), dtype=np.int32)
+    visit_counts = np.bincount(predicted, minlength=len(classes))
 
-    for class_name, visit_count in animal_visits.items():
+    for class_name, visit_count in zip(classes, visit_counts):
         print("{:<10} {}".format(class_name, visit_count))
 
     #show_visits_over_days(visits)